@@ -0,0 +1,241 @@
+# bench/check_correctness.py
+"""
+최적화 경로가 원래 동작과 같은 결과를 내는지 확인
+
+실행 (real-estate-forecast 디렉터리에서):
+    python bench/check_correctness.py
+    python bench/check_correctness.py --scale 10 --n-jobs 4
+
+1) make_training_data_partitioned 결과가 make_training_data (메모리 방식) 와 같은지 (행 순서 무시)
+2) compact 모델 예측이 sklearn RandomForestRegressor 예측과 같은지, NaN 입력을 거부하는지
+3) InferenceBatcher 가 실패한 row 의 요청만 실패시키고, 어떤 경우에도 모든 Future 를 끝내는지
+
+각 check_* 함수는 실패 설명 목록을 돌려준다 (비어 있으면 통과). 하나라도 실패하면 종료 코드 1.
+run_benchmarks.py 도 같은 함수로 scale 마다 1), 2) 를 확인한다.
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(PROJECT_DIR, "ml"))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "server"))
+
+import synthetic_data  # noqa: E402
+
+# compact 모델과 sklearn 예측값 허용 오차 (상대)
+PREDICTION_RTOL = 1e-9
+
+
+def _sorted_training_frame(df):
+    import pandas as pd
+
+    from prepare_data import TRAINING_COLUMNS
+
+    df = df[TRAINING_COLUMNS].copy()
+    df["aptNm"] = df["aptNm"].astype(str)
+    df["dealDate"] = pd.to_datetime(df["dealDate"]).astype("datetime64[ns]")
+    for col in TRAINING_COLUMNS[3:] + ["area_bucket"]:
+        df[col] = df[col].astype("float64")
+    return df.sort_values(TRAINING_COLUMNS).reset_index(drop=True)
+
+
+def check_training_data(csv_path="data/sangdo_training.csv", parquet_path="data/sangdo_training.parquet"):
+    """메모리 방식(csv) 과 파티션 방식(parquet) 학습 데이터가 행 순서만 빼고 같은지"""
+    import pandas as pd
+
+    expected = _sorted_training_frame(pd.read_csv(csv_path, encoding="utf-8-sig"))
+    actual = _sorted_training_frame(pd.read_parquet(parquet_path))
+    if len(expected) != len(actual):
+        return [f"training data: {len(actual)} partitioned rows vs {len(expected)} in-memory rows"]
+    try:
+        pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-12)
+    except AssertionError as e:
+        return [f"training data differs: {str(e).splitlines()[0]}"]
+    return []
+
+
+def check_compact_model(model_path="ml/model.joblib", compact_path="ml/model_compact.npz",
+                        training_path="data/sangdo_training.csv", max_rows=2000):
+    """compact 모델과 sklearn 모델의 예측이 같은지, compact 모델이 NaN 입력을 거부하는지"""
+    import joblib
+    import numpy as np
+    import pandas as pd
+
+    from compact_model import load_compact_forest
+
+    bundle = joblib.load(model_path)
+    compact = load_compact_forest(compact_path)
+    failures = []
+    if list(compact.features) != list(bundle["features"]):
+        failures.append(f"compact model features {compact.features} != {bundle['features']}")
+        return failures
+
+    df = pd.read_csv(training_path, encoding="utf-8-sig").dropna(subset=compact.features)
+    X = df[compact.features].head(max_rows).to_numpy(dtype=float)
+    expected = bundle["model"].predict(X)
+    actual = compact.predict(X)
+    if not np.allclose(actual, expected, rtol=PREDICTION_RTOL, atol=0):
+        worst = int(np.argmax(np.abs(actual - expected)))
+        failures.append(f"compact prediction {actual[worst]} != sklearn {expected[worst]} (row {worst})")
+
+    bad_row = X[:1].copy()
+    bad_row[0, 0] = np.nan
+    try:
+        compact.predict(bad_row)
+        failures.append("compact model accepted NaN input")
+    except ValueError:
+        pass
+    return failures
+
+
+def check_inference_batcher(timeout=5.0):
+    """InferenceBatcher 실패 격리 / Future 완료 / 한가할 때 바로 예측"""
+    from inference_batcher import InferenceBatcher
+
+    failures = []
+
+    # 1. 배치 안의 한 row 가 실패해도 나머지 요청은 정상 결과를 받는다
+    release = threading.Event()
+
+    def predict_fn(rows):
+        if rows[0][0] == 0:
+            release.wait(timeout)  # 첫 배치를 잡아두고 나머지를 한 배치로 모으기
+        if any(row[0] < 0 for row in rows):
+            raise ValueError("negative feature")
+        return [row[0] * 2 for row in rows]
+
+    batcher = InferenceBatcher(predict_fn, max_batch_size=8, max_wait_ms=50)
+    try:
+        futures = {value: batcher.submit([value]) for value in (0, 1, -1, 2, 3)}
+        duplicate = batcher.submit([2])
+        release.set()
+        for value, future in futures.items():
+            try:
+                result = future.result(timeout=timeout)
+                if value < 0:
+                    failures.append(f"batcher: row {value} should fail, got {result}")
+                elif result != value * 2:
+                    failures.append(f"batcher: row {value} -> {result}, expected {value * 2}")
+            except ValueError:
+                if value >= 0:
+                    failures.append(f"batcher: row {value} failed because another row in its batch failed")
+        if duplicate is not futures[2]:
+            failures.append("batcher: identical in-flight row was not deduplicated")
+        if batcher.stats().get("fallback_batches", 0) < 1:
+            failures.append("batcher: no batch fell back to per-row prediction")
+    except Exception as e:
+        failures.append(f"batcher: isolation check raised {type(e).__name__}: {e}")
+    finally:
+        release.set()
+        batcher.close()
+
+    # 2. predict_fn 이 잘못된 개수 / 타입을 돌려줘도 모든 Future 가 끝나고 워커는 계속 동작
+    for name, bad_fn in (
+        ("wrong length", lambda rows: []),
+        ("wrong type", lambda rows: ["x"] * len(rows)),
+    ):
+        batcher = InferenceBatcher(bad_fn, max_wait_ms=5)
+        try:
+            for future in [batcher.submit([value]) for value in range(4)]:
+                try:
+                    future.result(timeout=timeout)
+                    failures.append(f"batcher ({name}): bad output was returned as a result")
+                except (ValueError, TypeError):
+                    pass
+            if not batcher._worker.is_alive():
+                failures.append(f"batcher ({name}): worker thread died")
+        except Exception as e:
+            failures.append(f"batcher ({name}): future did not complete ({type(e).__name__})")
+        finally:
+            batcher.close()
+
+    # 3. 혼자 온 요청은 max_wait_ms 를 기다리지 않는다
+    batcher = InferenceBatcher(lambda rows: [0.0] * len(rows), max_wait_ms=200)
+    try:
+        start = time.perf_counter()
+        batcher.predict([1], timeout=timeout)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= 100:
+            failures.append(f"batcher: lone request waited {elapsed_ms:.0f}ms")
+    finally:
+        batcher.close()
+
+    return failures
+
+
+@contextlib.contextmanager
+def _workspace(scale):
+    """scale 배 합성 raw 데이터가 있는 임시 디렉터리로 chdir"""
+    old_cwd = os.getcwd()
+    tmp = tempfile.mkdtemp(prefix=f"check_x{scale}_")
+    try:
+        os.makedirs(os.path.join(tmp, "data"))
+        os.makedirs(os.path.join(tmp, "ml"))
+        synthetic_data.write_scaled_raw(
+            os.path.join(tmp, "data", "sangdo_raw.csv"),
+            scale,
+            seed_path=os.path.join(PROJECT_DIR, synthetic_data.RAW_PATH),
+        )
+        os.chdir(tmp)
+        yield tmp
+    finally:
+        os.chdir(old_cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def run_checks(scale=1, n_jobs=2):
+    """모든 검사 실행. {검사 이름: 실패 목록}"""
+    import prepare_data
+    import train_model
+
+    results = {}
+    with _workspace(scale), contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        prepare_data.make_training_data()
+
+        failures = []
+        for jobs in sorted({1, n_jobs}):
+            prepare_data.make_training_data_partitioned(n_jobs=jobs, num_partitions=16, chunksize=1000)
+            failures += [f"n_jobs={jobs}: {f}" for f in check_training_data()]
+        results["training_data"] = failures
+
+        train_model.main()
+        results["compact_model"] = check_compact_model()
+
+    results["inference_batcher"] = check_inference_batcher()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="최적화 경로 결과 확인")
+    parser.add_argument("--scale", type=int, default=1, help="합성 데이터 배수")
+    parser.add_argument("--n-jobs", type=int, default=2, help="파티션 방식 병렬 worker 수")
+    args = parser.parse_args()
+
+    results = run_checks(args.scale, args.n_jobs)
+    total = 0
+    for name, failures in results.items():
+        print(f"{name:<20} {'ok' if not failures else 'FAILED'}")
+        for failure in failures:
+            print(f"  {failure}")
+        total += len(failures)
+
+    if total:
+        print(f"\n{total} check(s) failed")
+        sys.exit(1)
+    print("\nAll checks passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# bench/load_test_inference.py
+"""
+예측 엔드포인트 부하 테스트: 요청마다 model.predict vs InferenceBatcher
+
+실행 (real-estate-forecast 디렉터리에서, ml/model.joblib 필요):
+    python bench/load_test_inference.py --threads 16 --requests 20
+    python bench/load_test_inference.py --endpoint /price-history --max-wait-ms 5
+
+Flask test client 로 여러 스레드에서 동시에 요청을 보내고 모드별 처리량(req/s)과
+지연 시간(p50/p95)을 비교한다. 결과는 bench/results/load_test.json 에 저장.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import warnings
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_OUT = os.path.join(BENCH_DIR, "results", "load_test.json")
+
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(PROJECT_DIR, "server"))
+
+
+def run_load(client, endpoint, payloads, threads, requests_per_thread):
+    """threads 개 스레드가 각각 requests_per_thread 번 요청. 처리량 / 지연 통계 반환."""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(t):
+        local = []
+        barrier.wait()
+        for k in range(requests_per_thread):
+            payload = payloads[(t * requests_per_thread + k) % len(payloads)]
+            start = time.perf_counter()
+            res = client.post(endpoint, json=payload)
+            local.append(time.perf_counter() - start)
+            if res.status_code != 200:
+                with lock:
+                    errors.append(res.status_code)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "elapsed_s": elapsed,
+        "throughput_rps": len(latencies) / elapsed,
+        "latency_p50_ms": latencies[len(latencies) // 2] * 1000,
+        "latency_p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        "latency_mean_ms": statistics.mean(latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="예측 micro-batching 부하 테스트")
+    parser.add_argument("--endpoint", default="/predict-price", choices=["/predict-price", "/price-history"])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=20, help="스레드당 요청 수")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    args = parser.parse_args()
+
+    os.chdir(PROJECT_DIR)
+    os.environ["INFERENCE_BATCHING"] = "0"
+    warnings.simplefilter("ignore")
+
+    import app as app_module
+    from inference_batcher import InferenceBatcher
+
+    client = app_module.app.test_client()
+
+    # 단지마다 서로 다른 feature row 가 나오도록 전체 단지를 돌아가며 요청
+    apt_names = app_module.deals_df["aptNm"].value_counts().index.tolist()
+    payloads = [{"aptNm": name} for name in apt_names]
+
+    report = {
+        "endpoint": args.endpoint,
+        "model_format": app_module.startup_state["model_format"],
+        "threads": args.threads,
+        "requests_per_thread": args.requests,
+    }
+    print(f"model format: {report['model_format']} (MODEL_FORMAT=joblib 로 sklearn 모델 강제)")
+
+    # 워밍업
+    for payload in payloads[:5]:
+        client.post(args.endpoint, json=payload)
+
+    report["direct"] = run_load(client, args.endpoint, payloads, args.threads, args.requests)
+
+    app_module.inference_batcher = InferenceBatcher(
+        app_module.model.predict,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+    )
+    report["batched"] = run_load(client, args.endpoint, payloads, args.threads, args.requests)
+    report["batched"]["batcher"] = app_module.inference_batcher.stats()
+    app_module.inference_batcher.close()
+
+    # 모든 요청이 같은 단지 -> 진행 중인 같은 row 는 한 번만 예측
+    app_module.inference_batcher = InferenceBatcher(
+        app_module.model.predict,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+    )
+    report["batched_same_apt"] = run_load(client, args.endpoint, payloads[:1], args.threads, args.requests)
+    report["batched_same_apt"]["batcher"] = app_module.inference_batcher.stats()
+    app_module.inference_batcher.close()
+
+    report["speedup"] = report["batched"]["throughput_rps"] / report["direct"]["throughput_rps"]
+
+    for mode in ("direct", "batched", "batched_same_apt"):
+        r = report[mode]
+        print(
+            f"{mode:<18} {r['throughput_rps']:>8.1f} req/s  "
+            f"p50 {r['latency_p50_ms']:>7.1f}ms  p95 {r['latency_p95_ms']:>7.1f}ms  errors {r['errors']}"
+        )
+    batch_size = report["batched"]["batcher"]["batch_size"]
+    print(f"batched: mean batch size {batch_size['mean']:.1f}, max {batch_size['max']}")
+    print(f"speedup: {report['speedup']:.2f}x")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Saved results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
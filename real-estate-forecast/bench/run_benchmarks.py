@@ -0,0 +1,387 @@
+# bench/run_benchmarks.py
+"""
+데이터 파이프라인 / 학습 / API 핫패스 벤치마크
+
+실행 (real-estate-forecast 디렉터리에서):
+    python bench/run_benchmarks.py --scales 1,10
+    python bench/run_benchmarks.py --scales 1,10 --save-baseline
+    python bench/run_benchmarks.py --scales 1,10 --baseline bench/results/baseline.json
+    python bench/run_benchmarks.py --scales 1 --index-scales 1,10,100 --skip-train
+
+scale 마다 임시 작업 디렉터리(data/, ml/)를 만들고 합성 raw 데이터를 넣은 뒤
+기존 스크립트들을 그대로 (상대 경로 기준으로) 실행해서 시간을 잰다.
+파티션 방식 학습 데이터와 compact 모델 예측은 기존 결과와 같은지도 확인한다 (bench/check_correctness.py).
+아파트 이름 검색(AptNameIndex)은 index scale 마다 합성 데이터의 distinct 이름만으로
+인덱스를 만들어 여러 종류의 검색어(한 글자, 초성, 입력 중, 오타)로 따로 잰다.
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+DEFAULT_OUT = os.path.join(RESULTS_DIR, "latest.json")
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, "baseline.json")
+
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(PROJECT_DIR, "ml"))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "server"))
+
+import synthetic_data  # noqa: E402
+from check_correctness import check_compact_model, check_training_data  # noqa: E402
+
+
+def load_module(name, path):
+    """스크립트 파일을 새 모듈로 로드 (server/app.py 처럼 import 시점에 데이터를 읽는 파일용)"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def timeit(fn, repeat=3, warmup=0):
+    """fn 을 repeat 번 실행한 시간(초) 통계. fn 의 stdout 출력과 경고는 버린다."""
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for _ in range(warmup):
+            fn()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+
+    return {
+        "repeat": repeat,
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.mean(times),
+        "max_s": max(times),
+    }
+
+
+def peak_memory_mb(fn):
+    """fn 실행 중 Python/numpy 할당 최대치 (MB, tracemalloc 기준)"""
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+@contextlib.contextmanager
+def workspace(scale, seed_path):
+    """scale 배 합성 데이터가 들어있는 임시 작업 디렉터리로 chdir"""
+    old_cwd = os.getcwd()
+    tmp = tempfile.mkdtemp(prefix=f"bench_x{scale}_")
+    try:
+        os.makedirs(os.path.join(tmp, "data"))
+        os.makedirs(os.path.join(tmp, "ml"))
+        rows = synthetic_data.write_scaled_raw(
+            os.path.join(tmp, "data", "sangdo_raw.csv"), scale, seed_path=seed_path
+        )
+        os.chdir(tmp)
+        yield rows
+    finally:
+        os.chdir(old_cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def endpoint_cases(deals_df):
+    """각 엔드포인트에 보낼 대표 요청 (거래가 가장 많은 단지 기준)"""
+    top_apt = deals_df["aptNm"].value_counts().idxmax()
+    top_bucket = float(
+        deals_df[deals_df["aptNm"] == top_apt]["area_bucket"].value_counts().idxmax()
+    )
+    return [
+        ("health", "GET", "/health", None),
+        ("search_apartments", "POST", "/search-apartments", {"query": top_apt[:2]}),
+        ("get_area_buckets", "POST", "/get-area-buckets", {"aptNm": top_apt}),
+        ("predict_price", "POST", "/predict-price", {"aptNm": top_apt, "area_bucket": top_bucket}),
+        ("price_history", "POST", "/price-history", {"aptNm": top_apt, "years": 5}),
+    ]
+
+
+def bench_scale(scale, args):
+    """한 scale 에 대한 벤치마크 결과 dict 반환"""
+    import compact_model
+    import joblib
+    import prepare_data
+    import train_model
+
+    results = {}
+    repeat = args.repeat
+
+    with workspace(scale, args.seed_path) as raw_rows:
+        print(f"[x{scale}] raw rows: {raw_rows}")
+
+        results["make_training_data"] = timeit(prepare_data.make_training_data, repeat=repeat)
+        print(f"[x{scale}] make_training_data: {results['make_training_data']['median_s']:.3f}s")
+
+        results["make_training_data_partitioned"] = timeit(
+            lambda: prepare_data.make_training_data_partitioned(out_path="data/sangdo_training.parquet"),
+            repeat=repeat,
+        )
+        print(
+            f"[x{scale}] make_training_data_partitioned: "
+            f"{results['make_training_data_partitioned']['median_s']:.3f}s"
+        )
+
+        # 파티션 방식 결과가 메모리 방식과 같은지 (행 순서 무시)
+        failures = check_training_data()
+
+        if args.memory:
+            # tracemalloc 은 느리므로 시간 측정과 따로 한 번씩만 실행
+            results["make_training_data"]["peak_mem_mb"] = peak_memory_mb(prepare_data.make_training_data)
+            results["make_training_data_partitioned"]["peak_mem_mb"] = peak_memory_mb(
+                lambda: prepare_data.make_training_data_partitioned(out_path="data/sangdo_training.parquet")
+            )
+            print(
+                f"[x{scale}] peak memory: in-memory {results['make_training_data']['peak_mem_mb']:.1f}MB, "
+                f"partitioned {results['make_training_data_partitioned']['peak_mem_mb']:.1f}MB"
+            )
+
+        if args.skip_train:
+            # 학습을 건너뛸 때는 원래 모델로 서버 벤치마크만 수행
+            shutil.copy(args.model_path, "ml/model.joblib")
+            if os.path.exists(args.compact_model_path):
+                shutil.copy(args.compact_model_path, "ml/model_compact.npz")
+        else:
+            results["train_model"] = timeit(train_model.main, repeat=1)
+            print(f"[x{scale}] train_model.main: {results['train_model']['median_s']:.3f}s")
+
+        results["model_load"] = timeit(lambda: joblib.load("ml/model.joblib"), repeat=repeat)
+        print(f"[x{scale}] model load: {results['model_load']['median_s']:.3f}s")
+
+        if os.path.exists("ml/model_compact.npz"):
+            failures += check_compact_model()
+            results["compact_model_load"] = timeit(
+                lambda: compact_model.load_compact_forest("ml/model_compact.npz"), repeat=repeat
+            )
+            print(f"[x{scale}] compact model load: {results['compact_model_load']['median_s']:.3f}s")
+
+        app_path = os.path.join(PROJECT_DIR, "server", "app.py")
+        holder = {}
+
+        def import_app():
+            holder["app"] = load_module(f"bench_app_x{scale}", app_path)
+
+        results["app_import"] = timeit(import_app, repeat=1)
+        app_module = holder["app"]
+        client = app_module.app.test_client()
+
+        cases = endpoint_cases(app_module.deals_df)
+        query = cases[1][3]["query"]
+        results["apt_index_search"] = timeit(lambda: app_module.apt_index.search(query), repeat=args.requests)
+        print(f"[x{scale}] apt_index.search: {results['apt_index_search']['median_s'] * 1000:.3f}ms")
+
+        for name, method, url, payload in cases:
+            if method == "GET":
+                call = lambda url=url: client.get(url)
+            else:
+                call = lambda url=url, payload=payload: client.post(url, json=payload)
+
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                status = call().status_code
+            stats = timeit(call, repeat=args.requests, warmup=1)
+            stats["status"] = status
+            results[f"endpoint_{name}"] = stats
+            print(f"[x{scale}] {url}: {stats['median_s'] * 1000:.2f}ms (status {status})")
+
+    for failure in failures:
+        print(f"[x{scale}] CHECK FAILED {failure}")
+    return {"raw_rows": raw_rows, "check_failures": failures, "benchmarks": results}
+
+
+# 검색 종류별 대표 검색어
+APT_INDEX_QUERIES = [
+    "상",  # 한 글자 (앞부분 일치가 아주 많음)
+    "아파트",  # 중간 일치
+    "ㅅㄷ",  # 초성
+    "ㅎㅅㅌ",  # 초성
+    "상ㄷ",  # 입력 중인 마지막 글자
+    "e편한새상상도노빌리티",  # 긴 이름 + 오타
+    "레미안상도",  # 짧은 이름 + 오타
+    "상도역롯데캐슬파크엘",  # 이름 전체 (정확히 일치)
+    "상도동래미안1차 5단지",  # 합성 단지 이름 전체 (1배 데이터에는 없음)
+    "힐스테이트상도센트럴파크 10단지",
+]
+
+# /search-apartments 기본 limit 과 같게
+APT_INDEX_LIMIT = 20
+
+
+# 검색 동작 확인: (검색어, 첫 번째 결과 이름이 이것으로 시작, 첫 번째 결과 종류, 결과에 없어야 하는 이름)
+APT_INDEX_CHECKS = [
+    ("e편한세상 상도", "e편한세상상도노빌리티", "prefix", None),  # 공백 무시
+    ("E편한세상상도노빌리티", "e편한세상상도노빌리티", "exact", None),  # 대소문자 무시
+    ("ㅅㄷ", "상도", "choseong_prefix", "롯데캐슬비엔"),  # 초성 앞부분이 초성 중간보다 위
+    ("ㅎㅅㅌㅇㅌ", "힐스테이트", "choseong_prefix", None),
+    ("상ㄷ", "상도", "prefix", None),  # 입력 중인 마지막 글자 (초성)
+    ("사", "상", "prefix", None),  # 입력 중인 마지막 글자 (받침 없음)
+    ("장", None, None, "상도파크자이"),  # 글자 경계를 넘는 자모 일치는 안 됨
+    ("e편한새상", "e편한세상상도노빌리티", "fuzzy", None),  # 오타
+    ("레미안상도", "래미안상도3차", "fuzzy", None),
+]
+
+
+def check_apt_index(index):
+    """APT_INDEX_CHECKS 중 실패한 항목 설명 목록"""
+    failures = []
+    for query, expected, kind, excluded in APT_INDEX_CHECKS:
+        matches = index.search(query)
+        top = matches[0] if matches else None
+        if expected is not None and (top is None or not top.aptNm.startswith(expected) or top.kind != kind):
+            failures.append(f"{query!r}: expected {expected}... ({kind}), got {top}")
+        if excluded is not None and any(m.aptNm.startswith(excluded) for m in matches):
+            failures.append(f"{query!r}: {excluded} should not match")
+    return failures
+
+
+def bench_apt_index(scale, args):
+    """합성 데이터의 distinct 아파트 이름으로 AptNameIndex 를 만들고 검색어별 시간 측정"""
+    from apt_matcher import AptNameIndex
+
+    seed_df = synthetic_data.load_seed(args.seed_path)
+    names = synthetic_data.scale_raw_data(seed_df, scale)["aptNm"].value_counts().to_dict()
+
+    holder = {}
+    results = {"build": timeit(lambda: holder.update(index=AptNameIndex(names)), repeat=1)}
+    index = holder["index"]
+    print(f"[apt_index x{scale}] build ({len(index)} names): {results['build']['median_s']:.3f}s")
+
+    failures = check_apt_index(index)
+    for failure in failures:
+        print(f"[apt_index x{scale}] CHECK FAILED {failure}")
+
+    for query in APT_INDEX_QUERIES:
+        stats = timeit(lambda: index.search(query, limit=APT_INDEX_LIMIT), repeat=args.requests, warmup=1)
+        results[f"search {query}"] = stats
+        print(f"[apt_index x{scale}] search {query!r}: {stats['median_s'] * 1000:.3f}ms")
+
+    return {"names": len(index), "check_failures": failures, "benchmarks": results}
+
+
+def git_revision():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, threshold):
+    """
+    baseline 대비 median 시간 비교. threshold 배 이상 느려진 항목 목록 반환.
+    (두 결과 모두에 있는 scale/항목만 비교)
+    """
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for section, prefix in (("scales", "x"), ("apt_index", "apt_index x")):
+        for scale, cur in current.get(section, {}).items():
+            base = baseline.get(section, {}).get(scale)
+            if base is None:
+                continue
+            for name, stats in cur["benchmarks"].items():
+                base_stats = base["benchmarks"].get(name)
+                if base_stats is None:
+                    continue
+                ratio = stats["median_s"] / base_stats["median_s"] if base_stats["median_s"] else float("inf")
+                label = f"{prefix}{scale} {name}"
+                flag = ""
+                if ratio >= threshold:
+                    regressions.append((label, ratio))
+                    flag = "  <-- slower"
+                print(
+                    f"{label:<40} {base_stats['median_s'] * 1000:>10.2f}ms "
+                    f"{stats['median_s'] * 1000:>10.2f}ms {ratio:>7.2f}x{flag}"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="파이프라인 / 학습 / API 벤치마크")
+    parser.add_argument("--scales", default="1,10", help="콤마로 구분한 데이터 배수 (예: 1,10,100)")
+    parser.add_argument("--index-scales", default="1,10,100", help="아파트 이름 검색 벤치마크의 데이터 배수")
+    parser.add_argument("--repeat", type=int, default=3, help="파이프라인/모델 로드 반복 횟수")
+    parser.add_argument("--requests", type=int, default=50, help="엔드포인트별 요청 횟수")
+    parser.add_argument("--memory", action="store_true", help="학습 데이터 생성의 peak memory도 측정")
+    parser.add_argument("--skip-train", action="store_true", help="학습 벤치마크 생략 (기존 ml/model.joblib 사용)")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="결과 JSON 경로")
+    parser.add_argument("--baseline", help="비교할 baseline JSON 경로")
+    parser.add_argument("--save-baseline", action="store_true", help=f"결과를 {DEFAULT_BASELINE} 에도 저장")
+    parser.add_argument("--threshold", type=float, default=1.2, help="이 배수 이상 느려지면 regression")
+    args = parser.parse_args()
+
+    args.seed_path = os.path.join(PROJECT_DIR, synthetic_data.RAW_PATH)
+    args.model_path = os.path.join(PROJECT_DIR, "ml", "model.joblib")
+    args.compact_model_path = os.path.join(PROJECT_DIR, "ml", "model_compact.npz")
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    index_scales = [int(s) for s in args.index_scales.split(",") if s.strip()]
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "scales": {},
+        "apt_index": {},
+    }
+    for scale in scales:
+        report["scales"][str(scale)] = bench_scale(scale, args)
+    for scale in index_scales:
+        report["apt_index"][str(scale)] = bench_apt_index(scale, args)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nSaved results to {args.out}")
+
+    if args.save_baseline:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        shutil.copy(args.out, DEFAULT_BASELINE)
+        print(f"Saved baseline to {DEFAULT_BASELINE}")
+
+    check_failures = sum(
+        len(entry["check_failures"])
+        for section in ("scales", "apt_index")
+        for entry in report[section].values()
+    )
+    if check_failures:
+        print(f"\n{check_failures} check(s) failed")
+        sys.exit(1)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold}x")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
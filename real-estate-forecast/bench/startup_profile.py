@@ -0,0 +1,230 @@
+# bench/startup_profile.py
+"""
+서버 cold start 프로파일
+
+실행 (real-estate-forecast 디렉터리에서, ml/model.joblib / ml/model_compact.npz 필요):
+    python bench/startup_profile.py
+    python bench/startup_profile.py --save-baseline
+    python bench/startup_profile.py --baseline bench/results/startup_baseline.json
+
+1) python -X importtime 으로 server/app.py import 시 모듈별 import 시간 (상위 N개)
+2) STARTUP_MODE(eager/background) x MODEL_FORMAT(joblib/compact) 조합마다 서버 프로세스를 띄워서
+   /health/live 와 /health/ready 가 200 을 줄 때까지 걸린 시간, 로드 단계별 시간, sklearn import 여부
+결과는 bench/results/startup.json 에 저장하고, baseline 과 비교해서 느려진 항목을 표시한다.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+DEFAULT_OUT = os.path.join(RESULTS_DIR, "startup.json")
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, "startup_baseline.json")
+
+APP_PATH = os.path.join(PROJECT_DIR, "server", "app.py")
+
+CONFIGS = [
+    ("eager", "joblib"),
+    ("eager", "compact"),
+    ("background", "joblib"),
+    ("background", "compact"),
+]
+
+
+def server_env(startup_mode, model_format, port=None):
+    env = dict(os.environ)
+    env["STARTUP_MODE"] = startup_mode
+    env["MODEL_FORMAT"] = model_format
+    env["PYTHONPATH"] = os.path.join(PROJECT_DIR, "server")
+    if port is not None:
+        env["PORT"] = str(port)
+    return env
+
+
+def import_profile(startup_mode, model_format, top):
+    """
+    python -X importtime 결과 파싱.
+    반환: 전체 import 시간(초), 누적 시간 상위 top 개 모듈, 무거운 패키지 import 여부
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=PROJECT_DIR,
+        env=server_env(startup_mode, model_format),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        self_us, cumulative_us, name = int(parts[0]), int(parts[1]), parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append({"module": name.strip(), "self_s": self_us / 1e6, "cumulative_s": cumulative_us / 1e6, "depth": depth})
+
+    top_level = [m for m in modules if m["depth"] == 0]
+    imported = {m["module"].split(".")[0] for m in modules}
+    return {
+        "total_s": sum(m["cumulative_s"] for m in top_level),
+        "top": sorted(modules, key=lambda m: m["cumulative_s"], reverse=True)[:top],
+        "heavy_imports": {pkg: pkg in imported for pkg in ("pandas", "numpy", "sklearn", "joblib", "scipy")},
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_json(url):
+    """(status, body) 반환. 연결이 안 되면 (None, None)"""
+    try:
+        with urllib.request.urlopen(url, timeout=1) as res:
+            return res.status, json.loads(res.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None, None
+
+
+def startup_timing(startup_mode, model_format, timeout):
+    """서버 프로세스를 띄워 live/ready 까지 걸린 시간 측정"""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, APP_PATH],
+        cwd=PROJECT_DIR,
+        env=server_env(startup_mode, model_format, port),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    result = {"live_s": None, "ready_s": None, "ready_report": None}
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                result["error"] = f"server exited with {proc.returncode}"
+                break
+            if result["live_s"] is None:
+                status, _ = get_json(f"{base}/health/live")
+                if status == 200:
+                    result["live_s"] = time.perf_counter() - start
+            if result["live_s"] is not None:
+                status, body = get_json(f"{base}/health/ready")
+                if status == 200:
+                    result["ready_s"] = time.perf_counter() - start
+                    result["ready_report"] = body
+                    break
+            time.sleep(0.01)
+        else:
+            result["error"] = f"not ready after {timeout}s"
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    return result
+
+
+def flat_metrics(report):
+    """baseline 비교용 {이름: 초}"""
+    metrics = {}
+    for name, entry in report["configs"].items():
+        metrics[f"{name} import"] = entry["import"]["total_s"]
+        for key in ("live_s", "ready_s"):
+            if entry["startup"].get(key) is not None:
+                metrics[f"{name} {key[:-2]}"] = entry["startup"][key]
+    return metrics
+
+
+def compare(current, baseline, threshold):
+    """threshold 배 이상 느려진 항목 목록"""
+    cur, base = flat_metrics(current), flat_metrics(baseline)
+    regressions = []
+    print(f"\n{'metric':<32} {'baseline':>10} {'current':>10} {'ratio':>8}")
+    for name, value in cur.items():
+        if name not in base:
+            continue
+        ratio = value / base[name] if base[name] else float("inf")
+        flag = ""
+        if ratio >= threshold:
+            regressions.append((name, ratio))
+            flag = "  <-- slower"
+        print(f"{name:<32} {base[name] * 1000:>8.0f}ms {value * 1000:>8.0f}ms {ratio:>7.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서버 import / 시작 시간 프로파일")
+    parser.add_argument("--top", type=int, default=15, help="import 시간 상위 모듈 개수")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--baseline", help="비교할 baseline JSON 경로")
+    parser.add_argument("--save-baseline", action="store_true", help=f"결과를 {DEFAULT_BASELINE} 에도 저장")
+    parser.add_argument("--threshold", type=float, default=1.3, help="이 배수 이상 느려지면 regression")
+    args = parser.parse_args()
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "configs": {},
+    }
+
+    for startup_mode, model_format in CONFIGS:
+        name = f"{startup_mode}/{model_format}"
+        imports = import_profile(startup_mode, model_format, args.top)
+        startup = startup_timing(startup_mode, model_format, args.timeout)
+        report["configs"][name] = {"import": imports, "startup": startup}
+
+        ready_report = startup.get("ready_report") or {}
+        fmt = lambda v: f"{v * 1000:.0f}ms" if v is not None else "-"
+        print(
+            f"{name:<20} import {fmt(imports['total_s']):>7}  live {fmt(startup['live_s']):>7}  "
+            f"ready {fmt(startup['ready_s']):>7}  sklearn loaded: {ready_report.get('sklearn_loaded')}"
+            + (f"  ERROR: {startup['error']}" if startup.get("error") else "")
+        )
+
+    print("\nslowest imports (eager/joblib, cumulative):")
+    for m in report["configs"]["eager/joblib"]["import"]["top"]:
+        print(f"  {m['cumulative_s'] * 1000:>8.1f}ms  {'  ' * m['depth']}{m['module']}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nSaved results to {args.out}")
+
+    if args.save_baseline:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        shutil.copy(args.out, DEFAULT_BASELINE)
+        print(f"Saved baseline to {DEFAULT_BASELINE}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold}x")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
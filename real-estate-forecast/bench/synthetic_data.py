@@ -0,0 +1,84 @@
+# bench/synthetic_data.py
+"""
+sangdo_raw.csv 와 같은 스키마의 합성 데이터를 만든다.
+
+원본 단지들을 scale 배수만큼 복제하되, 복제본마다 단지명/aptSeq/구 코드를 바꾸고
+가격과 거래일을 조금씩 흔들어서 "단지 수가 scale 배인 지역" 처럼 보이게 한다.
+(학습 데이터는 단지+평형 그룹 단위로 만들어지므로 그룹 구조를 유지하는 게 중요)
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+RAW_PATH = "data/sangdo_raw.csv"
+
+# 복제본에 돌아가며 붙일 서울 구 코드 (첫 번째는 원본 동작구)
+SEOUL_SGG_CDS = [
+    11590, 11110, 11140, 11170, 11200, 11215, 11230, 11260, 11290, 11305,
+    11320, 11350, 11380, 11410, 11440, 11470, 11500, 11530, 11545, 11560,
+    11620, 11650, 11680, 11710, 11740,
+]
+
+RAW_COLUMNS = [
+    "aptNm", "aptSeq", "excluUseAr", "dealYear", "dealMonth", "dealDay",
+    "dealAmount", "buildYear", "umdNm", "sggCd", "floor", "dealDate",
+]
+
+
+def load_seed(path=RAW_PATH):
+    """복제의 원본이 될 raw 데이터 로드"""
+    return pd.read_csv(path)
+
+
+def scale_raw_data(seed_df, scale, random_state=42):
+    """
+    seed_df 를 scale 배로 키운 raw 데이터프레임 반환.
+    scale=1 이면 원본 그대로 (복사본).
+    """
+    if scale < 1:
+        raise ValueError(f"scale must be >= 1: {scale}")
+
+    rng = np.random.default_rng(random_state)
+    parts = [seed_df[RAW_COLUMNS].copy()]
+
+    for k in range(1, int(scale)):
+        part = seed_df[RAW_COLUMNS].copy()
+        n = len(part)
+
+        part["aptNm"] = part["aptNm"] + f" {k + 1}단지"
+        part["aptSeq"] = part["aptSeq"] + f"-{k + 1}"
+        part["sggCd"] = SEOUL_SGG_CDS[k % len(SEOUL_SGG_CDS)]
+
+        # 가격 ±5%, 거래일 ±10일 흔들기
+        noise = rng.uniform(0.95, 1.05, size=n)
+        part["dealAmount"] = (part["dealAmount"] * noise).round().astype("int64")
+
+        shift = pd.to_timedelta(rng.integers(-10, 11, size=n), unit="D")
+        deal_date = pd.to_datetime(part["dealDate"]) + shift
+        part["dealDate"] = deal_date.dt.strftime("%Y-%m-%d")
+        part["dealYear"] = deal_date.dt.year
+        part["dealMonth"] = deal_date.dt.month
+        part["dealDay"] = deal_date.dt.day
+
+        parts.append(part)
+
+    return pd.concat(parts, ignore_index=True)
+
+
+def write_scaled_raw(out_path, scale, seed_path=RAW_PATH, random_state=42):
+    """scale 배 합성 raw 데이터를 CSV로 저장하고 행 수 반환"""
+    df = scale_raw_data(load_seed(seed_path), scale, random_state=random_state)
+    df.to_csv(out_path, index=False, encoding="utf-8-sig")
+    return len(df)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="sangdo_raw.csv 형태의 합성 데이터 생성")
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--out", default="data/sangdo_raw_x10.csv")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = write_scaled_raw(args.out, args.scale, random_state=args.seed)
+    print(f"Saved {rows} rows to {args.out}")
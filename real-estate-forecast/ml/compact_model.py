@@ -0,0 +1,129 @@
+# ml/compact_model.py
+"""
+RandomForestRegressor 를 numpy 배열만으로 저장 / 예측하는 compact 포맷
+
+서버에서 sklearn 을 import 하지 않고(= 시작 시간 단축) 예측하기 위한 것.
+- 저장: 학습 직후 save_compact_forest(model, feature_cols, "ml/model_compact.npz", source_path="ml/model.joblib")
+- 로드: load_compact_forest("ml/model_compact.npz") -> CompactForest (predict 는 sklearn 과 같은 값)
+- 확인: is_compact_up_to_date("ml/model_compact.npz", "ml/model.joblib")
+  (저장할 때 기록한 원본 모델 파일의 sha256 이 지금과 같은지. 복사 방식과 상관없이 내용으로 비교)
+
+모든 트리의 노드를 배열 하나로 이어붙이고 자식 인덱스를 전역 인덱스로 바꿔서,
+(row, tree) 쌍 전체를 한 번에 한 단계씩 내려가는 방식으로 예측한다.
+결측값(NaN)/무한대 입력은 지원하지 않는다 (predict 에서 ValueError).
+"""
+import hashlib
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+def _file_sha256(path):
+    """파일 내용의 sha256 (hex)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def save_compact_forest(model, feature_cols, path, source_path=None):
+    """
+    학습된 RandomForestRegressor 를 npz 로 저장.
+    source_path: 같은 모델을 저장한 joblib 파일. 주면 내용의 sha256 을 기록해서 나중에 오래된 파일인지 확인할 수 있다.
+    """
+    lefts, rights, features, thresholds, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        left = tree.children_left.astype(np.int64)
+        right = tree.children_right.astype(np.int64)
+        is_leaf = left == -1
+
+        # 리프는 자기 자신을 가리키게 해서 예측 루프에서 분기 없이 멈추도록
+        own = np.arange(tree.node_count, dtype=np.int64) + offset
+        lefts.append(np.where(is_leaf, own, left + offset))
+        rights.append(np.where(is_leaf, own, right + offset))
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        values.append(tree.value[:, 0, 0].astype(np.float64))
+        roots.append(offset)
+
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    extra = {}
+    if source_path is not None:
+        extra["source_sha256"] = np.array(_file_sha256(source_path))
+
+    np.savez(
+        path,
+        format_version=np.int64(FORMAT_VERSION),
+        features=np.array(feature_cols, dtype=str),
+        children_left=np.concatenate(lefts),
+        children_right=np.concatenate(rights),
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        value=np.concatenate(values),
+        roots=np.array(roots, dtype=np.int64),
+        max_depth=np.int64(max_depth),
+        **extra,
+    )
+
+
+class CompactForest:
+    def __init__(self, arrays):
+        self.children_left = arrays["children_left"]
+        self.children_right = arrays["children_right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.max_depth = int(arrays["max_depth"])
+        self.features = [str(f) for f in arrays["features"]]
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def predict(self, X):
+        """X: (n_rows, n_features) -> 트리 평균 예측값 (n_rows,)"""
+        # sklearn 트리는 입력을 float32 로 바꿔서 threshold 와 비교한다
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if not np.isfinite(X).all():
+            # NaN 비교는 항상 False 라 조용히 오른쪽으로 내려가버리므로 받지 않는다
+            raise ValueError("input contains NaN or infinity")
+
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.children_left[node], self.children_right[node])
+
+        return self.value[node].mean(axis=1)
+
+
+def load_compact_forest(path):
+    """save_compact_forest 로 저장한 파일 로드"""
+    with np.load(path) as data:
+        version = int(data["format_version"])
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported compact model version: {version}")
+        arrays = {key: data[key] for key in data.files}
+    return CompactForest(arrays)
+
+
+def is_compact_up_to_date(path, source_path):
+    """
+    compact 모델이 source_path 의 모델에서 만들어졌고 그 뒤로 source_path 가 바뀌지 않았는지.
+    원본 정보가 기록되지 않은 파일은 확인할 수 없으므로 False.
+    """
+    with np.load(path) as data:
+        if "source_sha256" not in data.files:
+            return False
+        saved = str(data["source_sha256"])
+    return saved == _file_sha256(source_path)
@@ -1,4 +1,11 @@
 # ml/prepare_data.py
+import argparse
+import itertools
+import os
+import tempfile
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
 import requests
 import xml.etree.ElementTree as ET
 from urllib.parse import urlencode
@@ -6,6 +13,76 @@ import pandas as pd
 
 BASE_URL = "https://apis.data.go.kr/1613000/RTMSDataSvcAptTradeDev/getRTMSDataSvcAptTradeDev"
 
+# 학습 데이터 컬럼 (순서 고정)
+TRAINING_COLUMNS = [
+    "aptNm",
+    "area_bucket",
+    "dealDate",
+    "dealAmount_now",
+    "buildYear",
+    "age_at_deal",
+    "excluUseAr",
+    "floor",
+    "dealYear",
+    "dealMonth",
+    "price_5y",
+]
+
+# 학습에 꼭 필요한 값
+REQUIRED_COLUMNS = ["dealAmount_now", "price_5y", "excluUseAr", "age_at_deal"]
+
+
+def build_group_records(aptNm, area_bucket, grp):
+    """아파트 + 평형 그룹 하나에서 학습 row(dict) 목록 생성"""
+    grp = grp.sort_values("dealDate").reset_index(drop=True)
+
+    records = []
+    for i, row in grp.iterrows():
+        t_date = row["dealDate"]
+        if pd.isna(t_date):
+            continue
+
+        # 5년 뒤 ± 6개월 범위
+        future_start = t_date + pd.DateOffset(years=5) - pd.DateOffset(months=6)
+        future_end = t_date + pd.DateOffset(years=5) + pd.DateOffset(months=6)
+
+        future_rows = grp[
+            (grp["dealDate"] >= future_start)
+            & (grp["dealDate"] <= future_end)
+        ]
+
+        # 5년 뒤 근처에 거래 없으면 이 행은 학습에 사용 X
+        if len(future_rows) == 0:
+            continue
+
+        future_price = future_rows["dealAmount"].mean()
+
+        # 연식
+        build_year = row.get("buildYear")
+        deal_year = row.get("dealYear")
+        if pd.notna(build_year) and pd.notna(deal_year):
+            age_at_deal = int(deal_year) - int(build_year)
+        else:
+            age_at_deal = None
+
+        record = {
+            "aptNm": aptNm,
+            "area_bucket": area_bucket,
+            "dealDate": t_date,
+            "dealAmount_now": row["dealAmount"],  # 현재 시점 가격
+            "buildYear": build_year,
+            "age_at_deal": age_at_deal,
+            "excluUseAr": row["excluUseAr"],
+            "floor": row["floor"],
+            "dealYear": row["dealYear"],
+            "dealMonth": row["dealMonth"],
+            "price_5y": future_price,  # 타겟(5년 뒤 평균 거래가)
+        }
+        records.append(record)
+
+    return records
+
+
 def make_training_data():
     # 1. 방금 만든 raw 데이터 불러오기
     df = pd.read_csv("data/sangdo_raw.csv", parse_dates=["dealDate"])
@@ -19,65 +96,140 @@ def make_training_data():
 
     # 3. 아파트 + 평형 그룹별로 5년 뒤 가격 찾기
     for (aptNm, area_bucket), grp in df.groupby(["aptNm", "area_bucket"]):
-        grp = grp.sort_values("dealDate").reset_index(drop=True)
+        records.extend(build_group_records(aptNm, area_bucket, grp))
 
-        for i, row in grp.iterrows():
-            t_date = row["dealDate"]
-            if pd.isna(t_date):
-                continue
+    train_df = pd.DataFrame(records)
 
-            # 5년 뒤 ± 6개월 범위
-            future_start = t_date + pd.DateOffset(years=5) - pd.DateOffset(months=6)
-            future_end = t_date + pd.DateOffset(years=5) + pd.DateOffset(months=6)
+    # 4. 학습에 꼭 필요한 값 없는 행은 제거
+    train_df = train_df.dropna(subset=REQUIRED_COLUMNS)
 
-            future_rows = grp[
-                (grp["dealDate"] >= future_start)
-                & (grp["dealDate"] <= future_end)
-            ]
+    train_df.to_csv("data/sangdo_training.csv", index=False, encoding="utf-8-sig")
+    print("Saved training data to data/sangdo_training.csv")
+    print("shape:", train_df.shape)
 
-            # 5년 뒤 근처에 거래 없으면 이 행은 학습에 사용 X
-            if len(future_rows) == 0:
-                continue
+    return train_df
 
-            future_price = future_rows["dealAmount"].mean()
 
-            # 연식
-            build_year = row.get("buildYear")
-            deal_year = row.get("dealYear")
-            if pd.notna(build_year) and pd.notna(deal_year):
-                age_at_deal = int(deal_year) - int(build_year)
+def _partition_id(df, partition_by, num_partitions):
+    """
+    raw row 별 파티션 번호.
+    - "aptNm": 단지명 해시 (같은 단지는 항상 같은 파티션 -> 메모리 방식과 결과 동일)
+    - "sggCd": 구 코드 (구가 다른 동명 단지는 별도 그룹으로 취급됨, 구 코드가 없으면 -1)
+    """
+    if partition_by == "aptNm":
+        return df["aptNm"].map(lambda name: zlib.crc32(str(name).encode("utf-8")) % num_partitions)
+    if partition_by == "sggCd":
+        # groupby 가 NaN 키를 버리므로 구 코드 없는 row 는 별도 파티션으로
+        return df["sggCd"].fillna(-1).astype("int64")
+    raise ValueError(f"unknown partition_by: {partition_by}")
+
+
+def _spill_partitions(raw_path, spill_dir, partition_by, num_partitions, chunksize):
+    """raw CSV를 chunk 단위로 읽어서 파티션별 CSV로 나눠 저장. 파티션 파일 경로 목록 반환."""
+    paths = {}
+    for chunk in pd.read_csv(raw_path, chunksize=chunksize):
+        for part, part_df in chunk.groupby(_partition_id(chunk, partition_by, num_partitions)):
+            path = paths.get(part)
+            if path is None:
+                path = os.path.join(spill_dir, f"part-{part}.csv")
+                paths[part] = path
+                part_df.to_csv(path, index=False)
             else:
-                age_at_deal = None
-
-            record = {
-                "aptNm": aptNm,
-                "area_bucket": area_bucket,
-                "dealDate": t_date,
-                "dealAmount_now": row["dealAmount"],  # 현재 시점 가격
-                "buildYear": build_year,
-                "age_at_deal": age_at_deal,
-                "excluUseAr": row["excluUseAr"],
-                "floor": row["floor"],
-                "dealYear": row["dealYear"],
-                "dealMonth": row["dealMonth"],
-                "price_5y": future_price,  # 타겟(5년 뒤 평균 거래가)
-            }
-            records.append(record)
+                part_df.to_csv(path, mode="a", header=False, index=False)
+    return [paths[part] for part in sorted(paths)]
 
-    train_df = pd.DataFrame(records)
 
-    # 4. 학습에 꼭 필요한 값 없는 행은 제거
-    train_df = train_df.dropna(
-        subset=["dealAmount_now", "price_5y", "excluUseAr", "age_at_deal"]
-    )
+def _training_rows_for_partition(path):
+    """파티션 CSV 하나를 읽어서 학습 데이터프레임 생성 (프로세스 풀 worker)"""
+    df = pd.read_csv(path, parse_dates=["dealDate"])
+    df["area_bucket"] = (df["excluUseAr"] // 5) * 5
+    df = df.sort_values("dealDate")
 
-    train_df.to_csv("data/sangdo_training.csv", index=False, encoding="utf-8-sig")
-    print("Saved training data to data/sangdo_training.csv")
-    print("shape:", train_df.shape)
+    records = []
+    for (aptNm, area_bucket), grp in df.groupby(["aptNm", "area_bucket"]):
+        records.extend(build_group_records(aptNm, area_bucket, grp))
+
+    train_df = pd.DataFrame(records, columns=TRAINING_COLUMNS)
+    train_df = train_df.dropna(subset=REQUIRED_COLUMNS)
 
+    # 파티션마다 dtype이 달라지지 않도록 고정 (parquet schema 일치)
+    train_df["aptNm"] = train_df["aptNm"].astype(str)
+    train_df["dealDate"] = pd.to_datetime(train_df["dealDate"]).astype("datetime64[ns]")
+    numeric_cols = [col for col in TRAINING_COLUMNS if col not in ("aptNm", "dealDate")]
+    train_df[numeric_cols] = train_df[numeric_cols].astype("float64")
     return train_df
 
 
+def _iter_partition_frames(part_paths, n_jobs):
+    """
+    파티션별 학습 데이터프레임을 끝나는 순서대로 반환.
+    n_jobs > 1 이면 프로세스 풀에서 만들되, 결과가 메모리에 쌓이지 않도록 동시에 n_jobs * 2 개까지만 제출한다.
+    """
+    if n_jobs <= 1:
+        yield from map(_training_rows_for_partition, part_paths)
+        return
+
+    paths = iter(part_paths)
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        pending = {
+            executor.submit(_training_rows_for_partition, path)
+            for path in itertools.islice(paths, n_jobs * 2)
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # 쓰는 동안에도 worker 가 놀지 않도록 끝난 만큼 먼저 채워 넣는다
+            pending.update(
+                executor.submit(_training_rows_for_partition, path)
+                for path in itertools.islice(paths, len(done))
+            )
+            for future in done:
+                yield future.result()
+
+
+def make_training_data_partitioned(
+    raw_path="data/sangdo_raw.csv",
+    out_path="data/sangdo_training.parquet",
+    partition_by="aptNm",
+    num_partitions=64,
+    chunksize=100_000,
+    n_jobs=1,
+    work_dir=None,
+):
+    """
+    make_training_data 의 out-of-core 버전.
+
+    1) raw CSV를 chunksize 행씩 읽어 파티션별 임시 CSV로 나누고
+    2) 파티션 하나씩 (n_jobs > 1 이면 프로세스 풀로) 학습 row를 만들어
+    3) 끝나는 대로 parquet 파일에 row group 단위로 이어서 쓴다.
+
+    메모리에는 raw chunk 하나 또는 파티션 몇 개(n_jobs > 1 이면 최대 n_jobs * 2 개)만 올라간다.
+    partition_by="aptNm" 이면 결과는 make_training_data 와 같다 (행 순서만 다름).
+    반환값: 저장된 학습 데이터 행 수
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [("aptNm", pa.string()), ("area_bucket", pa.float64()), ("dealDate", pa.timestamp("ns"))]
+        + [(col, pa.float64()) for col in TRAINING_COLUMNS[3:]]
+    )
+
+    total_rows = 0
+    with tempfile.TemporaryDirectory(dir=work_dir) as spill_dir:
+        part_paths = _spill_partitions(raw_path, spill_dir, partition_by, num_partitions, chunksize)
+
+        with pq.ParquetWriter(out_path, schema) as writer:
+            for train_df in _iter_partition_frames(part_paths, n_jobs):
+                if len(train_df) == 0:
+                    continue
+                writer.write_table(pa.Table.from_pandas(train_df, schema=schema, preserve_index=False))
+                total_rows += len(train_df)
+
+    print(f"Saved training data to {out_path}")
+    print("rows:", total_rows, "partitions:", len(part_paths))
+    return total_rows
+
+
 def fetch_deals_one_month(lawd_cd: str, deal_ym: str, service_key: str, num_of_rows: int = 1000):
     """
     lawd_cd: '11590' (동작구)
@@ -163,7 +315,28 @@ def fetch_sangdo_range(service_key: str, start_year: int = 2020, end_year: int =
 
 if __name__ == "__main__":
     SERVICE_KEY = "sCqdbs6ZAvEzlukEFMjMpzm382vZjp/kwNd8YSG6GLE1I+n9jpwBFEnIoAlCebThhnOPeaEIkXtGGLvVf40O3w=="
-    make_training_data()
+
+    parser = argparse.ArgumentParser(description="학습 데이터 생성")
+    parser.add_argument("--partitioned", action="store_true", help="파티션 단위로 parquet 생성 (out-of-core)")
+    parser.add_argument("--raw", default="data/sangdo_raw.csv")
+    parser.add_argument("--out", default="data/sangdo_training.parquet")
+    parser.add_argument("--partition-by", choices=["aptNm", "sggCd"], default="aptNm")
+    parser.add_argument("--partitions", type=int, default=64, help="aptNm 해시 파티션 개수")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--n-jobs", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.partitioned:
+        make_training_data_partitioned(
+            raw_path=args.raw,
+            out_path=args.out,
+            partition_by=args.partition_by,
+            num_partitions=args.partitions,
+            chunksize=args.chunksize,
+            n_jobs=args.n_jobs,
+        )
+    else:
+        make_training_data()
 
 
     
\ No newline at end of file
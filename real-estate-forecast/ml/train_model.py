@@ -1,13 +1,24 @@
 # ml/train_model.py
+import argparse
+
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error
 import joblib
 
-def main():
+from compact_model import save_compact_forest
+
+def load_training_data(path):
+    """학습 데이터 로드 (make_training_data_partitioned 결과인 parquet도 지원)"""
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def main(training_path="data/sangdo_training.csv"):
     # 1. 학습용 데이터 로드
-    df = pd.read_csv("data/sangdo_training.csv")
+    df = load_training_data(training_path)
 
     # 2. 사용할 feature와 target 정의
     feature_cols = [
@@ -53,6 +64,13 @@ def main():
     )
     print("Saved model to ml/model.joblib")
 
+    # 8. 서버용 compact 포맷 (sklearn 없이 로드/예측)
+    save_compact_forest(model, feature_cols, "ml/model_compact.npz", source_path="ml/model.joblib")
+    print("Saved compact model to ml/model_compact.npz")
+
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="5년 뒤 가격 예측 모델 학습")
+    parser.add_argument("--data", default="data/sangdo_training.csv", help="학습 데이터 (csv 또는 parquet)")
+    args = parser.parse_args()
+    main(args.data)
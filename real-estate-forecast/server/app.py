@@ -1,14 +1,61 @@
-from flask import Flask, request, jsonify
-import pandas as pd
-import joblib
+import os
+import sys
+import threading
+import time
 import traceback
 
+from flask import Flask, request, jsonify
+
+from apt_matcher import AptNameIndex
+from inference_batcher import InferenceBatcher
+
+MODULE_START = time.perf_counter()
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "ml"))
+
+# eager: import 시점에 모델/데이터를 모두 로드 (기존 동작)
+# background: 포트를 먼저 열고 별도 스레드에서 로드. 로드 전에는 /health/ready 와 API 가 503
+STARTUP_MODE = os.environ.get("STARTUP_MODE", "eager")
+
+# auto: ml/model_compact.npz 가 있으면 사용 (sklearn import 안 함), 없으면 ml/model.joblib
+# joblib / compact: 해당 포맷만 사용
+MODEL_FORMAT = os.environ.get("MODEL_FORMAT", "auto")
+MODEL_PATH = "ml/model.joblib"
+COMPACT_MODEL_PATH = "ml/model_compact.npz"
+
+# 배치 예측 결과를 기다리는 최대 시간 (워커가 멈춰도 요청이 무한정 기다리지 않도록)
+INFERENCE_TIMEOUT_S = float(os.environ.get("INFERENCE_TIMEOUT_S", 10))
+
+# /search-apartments 한 번에 돌려주는 최대 개수 (더 큰 limit 은 여기로 줄임)
+MAX_SEARCH_LIMIT = 50
+
 app = Flask(__name__)
 app.config["JSON_AS_ASCII"] = False 
 
+# load_resources() 가 채우는 값들
+model = None
+feature_cols = None
+deals_df = None
+apt_index = None
+deals_by_apt = None
+inference_batcher = None
+
+ready_event = threading.Event()
+startup_state = {
+    "status": "loading",
+    "mode": STARTUP_MODE,
+    "model_format": None,
+    "error": None,
+    "phases_s": {},
+    "ready_after_s": None,
+}
+
 
 def build_features_from_row(row):
     """하나의 거래 row에서 모델 입력 벡터(X)와 부가 정보 생성"""
+    import pandas as pd
+
     if pd.notna(row["buildYear"]) and pd.notna(row["dealYear"]):
         age_at_deal = int(row["dealYear"]) - int(row["buildYear"])
     else:
@@ -23,41 +70,157 @@ def build_features_from_row(row):
         "dealMonth": row["dealMonth"],
     }
 
-    # feature 누락 체크
+    # feature 누락 체크 (None 과 NaN 모두)
     for col in feature_cols:
-        if row_dict.get(col) is None:
+        if pd.isna(row_dict.get(col)):
             raise ValueError(f"missing feature: {col}")
 
     X = [[row_dict[col] for col in feature_cols]]
     return X, row_dict
-    
-# 1. 모델 로드
-model_bundle = joblib.load("ml/model.joblib")
-model = model_bundle["model"]
-feature_cols = model_bundle["features"]
 
-# 2. 상도동 실거래 데이터 로드
-deals_df = pd.read_csv("data/sangdo_raw.csv", parse_dates=["dealDate"])
-deals_df = deals_df[deals_df["umdNm"] == "상도동"].copy()
 
-deals_df["area_bucket"] = (deals_df["excluUseAr"] // 5) * 5  # 5㎡ 단위 버킷
+def load_model():
+    """MODEL_FORMAT 에 따라 (model, feature_cols, 포맷 이름) 로드"""
+    use_compact = MODEL_FORMAT == "compact" or (
+        MODEL_FORMAT == "auto" and os.path.exists(COMPACT_MODEL_PATH)
+    )
+    if use_compact:
+        from compact_model import is_compact_up_to_date, load_compact_forest
+
+        # auto 에서는 compact 모델을 만든 뒤에 model.joblib 이 바뀌었으면 joblib 사용
+        if (
+            MODEL_FORMAT == "auto"
+            and os.path.exists(MODEL_PATH)
+            and not is_compact_up_to_date(COMPACT_MODEL_PATH, MODEL_PATH)
+        ):
+            print(f"{COMPACT_MODEL_PATH} does not match {MODEL_PATH}, loading {MODEL_PATH}")
+        else:
+            compact = load_compact_forest(COMPACT_MODEL_PATH)
+            return compact, compact.features, "compact"
+
+    import joblib
+
+    model_bundle = joblib.load(MODEL_PATH)
+    return model_bundle["model"], model_bundle["features"], "joblib"
+
+
+def load_resources():
+    """모델, 상도동 거래 데이터, 검색 인덱스를 로드해서 전역 값 채우기"""
+    global model, feature_cols, deals_df, apt_index, deals_by_apt, inference_batcher
+
+    phases = startup_state["phases_s"]
+    try:
+        # 1. 모델 로드
+        start = time.perf_counter()
+        model, feature_cols, startup_state["model_format"] = load_model()
+        phases["model_load"] = time.perf_counter() - start
+
+        # 2. 상도동 실거래 데이터 로드
+        start = time.perf_counter()
+        import pandas as pd
+
+        deals_df = pd.read_csv("data/sangdo_raw.csv", parse_dates=["dealDate"])
+        deals_df = deals_df[deals_df["umdNm"] == "상도동"].copy()
+
+        deals_df["area_bucket"] = (deals_df["excluUseAr"] // 5) * 5  # 5㎡ 단위 버킷
+        phases["data_load"] = time.perf_counter() - start
+
+        # 3. 아파트 이름 검색 인덱스 (거래 건수가 많은 단지가 동순위에서 앞으로)
+        start = time.perf_counter()
+        apt_index = AptNameIndex(deals_df["aptNm"].value_counts().to_dict())
+        deals_by_apt = {apt_name: grp for apt_name, grp in deals_df.groupby("aptNm")}
+        phases["index_build"] = time.perf_counter() - start
+
+        # 4. 동시 요청의 예측을 모아서 한 번에 처리 (INFERENCE_BATCHING=0 이면 요청마다 바로 predict)
+        if os.environ.get("INFERENCE_BATCHING", "1") != "0":
+            inference_batcher = InferenceBatcher(
+                model.predict,
+                max_batch_size=int(os.environ.get("INFERENCE_MAX_BATCH_SIZE", 32)),
+                max_wait_ms=float(os.environ.get("INFERENCE_MAX_WAIT_MS", 2)),
+            )
+        else:
+            inference_batcher = None
+    except Exception as e:
+        startup_state["status"] = "failed"
+        startup_state["error"] = str(e)
+        traceback.print_exc()
+        if STARTUP_MODE != "background":
+            raise
+        return
+
+    startup_state["status"] = "ready"
+    startup_state["ready_after_s"] = time.perf_counter() - MODULE_START
+    ready_event.set()
+
+
+if STARTUP_MODE == "background":
+    threading.Thread(target=load_resources, name="startup-loader", daemon=True).start()
+else:
+    load_resources()
+
+
+def predict_one(x_row):
+    """feature row 하나의 5년 뒤 예측 가격"""
+    if inference_batcher is not None:
+        return inference_batcher.predict(x_row, timeout=INFERENCE_TIMEOUT_S)
+    return float(model.predict([x_row])[0])
+
+
+def find_apartment_deals(apt_name_query):
+    """검색어에 가장 잘 맞는 아파트 하나의 이름과 거래 데이터 (없으면 None, None)"""
+    apt_name = apt_index.resolve(apt_name_query)
+    if apt_name is None:
+        return None, None
+    return apt_name, deals_by_apt[apt_name]
+
+
+@app.before_request
+def require_ready():
+    """로드가 끝나기 전에는 health 체크 외의 요청을 503 으로 응답"""
+    if ready_event.is_set() or request.path.startswith("/health"):
+        return None
+    return jsonify({"error": "not_ready", "status": startup_state["status"]}), 503
 
 
 @app.route("/health", methods=["GET"])
 def health():
+    return jsonify({"status": "ok", "ready": ready_event.is_set()}), 200
+
+
+@app.route("/health/live", methods=["GET"])
+def health_live():
+    """liveness: 프로세스가 요청을 받을 수 있으면 200, 로드에 실패했으면 재시작하도록 503"""
+    if startup_state["status"] == "failed":
+        return jsonify({"status": "failed", "error": startup_state["error"]}), 503
     return jsonify({"status": "ok"}), 200
 
 
+@app.route("/health/ready", methods=["GET"])
+def health_ready():
+    """readiness: 모델과 데이터 로드가 끝났으면 200, 로드 중/실패면 503 (로드 단계별 시간 포함)"""
+    body = {**startup_state, "sklearn_loaded": "sklearn" in sys.modules}
+    return jsonify(body), 200 if ready_event.is_set() else 503
+
+
+@app.route("/inference-stats", methods=["GET"])
+def inference_stats():
+    """예측 micro-batcher 의 배치 크기 / 대기 시간 / 중복 제거 통계"""
+    if inference_batcher is None:
+        return jsonify({"batching": False}), 200
+    return jsonify({"batching": True, **inference_batcher.stats()}), 200
+
+
 @app.route("/search-apartments", methods=["POST"])
 def search_apartments():
     """
     요청 JSON 예시:
     {
-      "query": "상도"
+      "query": "상도",
+      "limit": 20          # 옵션, 기본 20개 (1 ~ MAX_SEARCH_LIMIT)
     }
     
     응답:
-    - 아파트 이름 목록 (중복 제거)
+    - 아파트 이름 목록 (일치 정도 순: 정확히 일치 > 앞부분 > 초성 > 중간 > 오타 허용)
     """
     try:
         data = request.get_json()
@@ -70,22 +233,22 @@ def search_apartments():
         if not query:
             return jsonify({"apartments": []}), 200
         
-        # 아파트 이름으로 검색 (대소문자 구분 없이)
-        matching_apts = deals_df[deals_df["aptNm"].str.contains(query, case=False, na=False)]
+        limit = data.get("limit", 20)
+        # bool 은 int 의 하위 타입이라 따로 거른다 (1.7, true, "5" 모두 400)
+        if isinstance(limit, bool) or not isinstance(limit, int) or limit < 1:
+            return jsonify({"error": "limit must be a positive integer"}), 400
+        limit = min(limit, MAX_SEARCH_LIMIT)
         
-        if matching_apts.empty:
-            return jsonify({"apartments": []}), 200
-        
-        # 중복 제거하고 아파트 목록 반환
-        unique_apartments = matching_apts["aptNm"].unique()
+        # 아파트 이름 인덱스로 검색 (공백/대소문자 무시, 초성, 오타 허용)
+        matches = apt_index.search(query, limit=limit)
         
         apartments = [
             {
-                "aptNm": apt_name,
+                "aptNm": match.aptNm,
                 "umdNm": "상도동",  # 모든 데이터가 상도동
                 "location": "서울 동작구 상도동"
             }
-            for apt_name in sorted(unique_apartments)
+            for match in matches
         ]
         
         return jsonify({"apartments": apartments}), 200
@@ -118,9 +281,9 @@ def get_area_buckets():
         apt_name_query = data["aptNm"].strip()
         
         # 해당 아파트의 거래 데이터 필터링
-        apt_deals = deals_df[deals_df["aptNm"].str.contains(apt_name_query, na=False)]
+        _, apt_deals = find_apartment_deals(apt_name_query)
         
-        if apt_deals.empty:
+        if apt_deals is None:
             return jsonify({"error": "apartment_not_found"}), 404
         
         # 해당 아파트의 평형 구간들 추출 (중복 제거, 정렬)
@@ -135,6 +298,8 @@ def get_area_buckets():
 
 @app.route("/predict-price", methods=["POST"])
 def predict_price():
+    import pandas as pd
+
     try:
         data = request.get_json()
 
@@ -145,9 +310,9 @@ def predict_price():
         area_bucket_filter = data.get("area_bucket")  # 평형 필터 추가
 
         # 3. 아파트 이름으로 검색
-        cand = deals_df[deals_df["aptNm"].str.contains(apt_name_query, na=False)]
+        _, cand = find_apartment_deals(apt_name_query)
 
-        if cand.empty:
+        if cand is None:
             return jsonify({"error": "apartment_not_found"}), 404
 
         # 평형 필터가 있으면 적용
@@ -182,13 +347,13 @@ def predict_price():
         }
 
         for col in feature_cols:
-            if row_dict.get(col) is None:
+            if pd.isna(row_dict.get(col)):
                 return jsonify({"error": "missing_feature", "missing": col}), 500
 
         X = [[row_dict[col] for col in feature_cols]]
 
         # 6. 5년 뒤 가격 예측
-        predicted_price = float(model.predict(X)[0])
+        predicted_price = predict_one(X[0])
 
         latest_price = float(latest["dealAmount"])
         change_rate = (predicted_price - latest_price) / latest_price
@@ -222,6 +387,8 @@ def price_history():
     - 평수(버킷)별 히스토리 라인 차트 데이터
     - 가장 최근 거래 기준 5년 뒤 예측 가격
     """
+    import pandas as pd
+
     try:
         data = request.get_json()
 
@@ -232,16 +399,13 @@ def price_history():
         years = int(data.get("years", 5))
         area_bucket_filter = data.get("area_bucket")  # 평형 필터 추가
 
-        # 1. 아파트 이름으로 후보 찾기
-        cand = deals_df[deals_df["aptNm"].str.contains(apt_name_query, na=False)]
+        # 1~2. 검색어에 가장 잘 맞는 단지 하나로 고정 (유사 이름 여러 개일 때)
+        top_apt, apt_deals = find_apartment_deals(apt_name_query)
 
-        if cand.empty:
+        if apt_deals is None:
             return jsonify({"error": "apartment_not_found"}), 404
 
-        # 2. 가장 많이 등장한 단지명으로 고정 (유사 이름 여러 개일 때)
-        top_apt = cand["aptNm"].value_counts().idxmax()
-
-        apt_deals = deals_df[deals_df["aptNm"] == top_apt].copy()
+        apt_deals = apt_deals.copy()
 
         # 평형 필터가 있으면 적용
         if area_bucket_filter:
@@ -286,7 +450,7 @@ def price_history():
         latest = apt_deals.sort_values("dealDate").iloc[-1]
         try:
             X, feat_dict = build_features_from_row(latest)
-            predicted_price = float(model.predict(X)[0])
+            predicted_price = predict_one(X[0])
             latest_price = float(latest["dealAmount"])
             change_rate = (predicted_price - latest_price) / latest_price
 
@@ -321,5 +485,11 @@ def price_history():
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    # 리로더는 프로세스를 하나 더 띄워서 다시 로드하므로 background 모드에서는 끈다
+    app.run(
+        host="0.0.0.0",
+        port=int(os.environ.get("PORT", 5000)),
+        debug=True,
+        use_reloader=STARTUP_MODE != "background",
+    )
 
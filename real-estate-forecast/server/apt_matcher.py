@@ -0,0 +1,412 @@
+# server/apt_matcher.py
+"""
+아파트 이름 검색용 인덱스
+
+서버 시작 시 distinct aptNm 으로 한 번 만들어두고, 요청마다 순위가 매겨진 후보를 돌려준다.
+- 공백/대소문자 정규화 ("e편한세상 상도" == "e편한세상상도")
+- 입력 중인 마지막 글자는 부분 일치 ("상ㄷ" -> "상도...", "사" -> "상...")
+- 초성 검색 ("ㅎㅅㅌㅇㅌ" -> "힐스테이트...")
+- 자모 단위 편집 거리(기본 2 이하)로 오타 허용 ("e편한새상" -> "e편한세상...")
+
+앞부분/중간 일치는 글자(음절) 경계에서만 시작하고, 부분 일치는 입력의 마지막 글자에만 허용한다.
+(자모 문자열로 비교하면 '장' 이 '자이' 의 'ㅈㅏ|ㅇ' 에 걸리는 식의 엉뚱한 일치가 생긴다)
+
+순위: 정확히 일치 > 앞부분 일치 > (초성 입력이면) 초성 앞부분 > 초성 중간 > 중간 일치 > 오타 허용
+같은 순위 안에서는 편집 거리, 거래 건수(많을수록 위), 이름 길이, 이름 순.
+각 단계는 limit 개까지만 찾고, limit 이 채워지면 다음 단계는 건너뛴다.
+오타 허용 단계는 정확히/앞부분 일치가 하나도 없을 때만 실행한다.
+"""
+import bisect
+import heapq
+import re
+import unicodedata
+from collections import namedtuple
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+
+EXACT = "exact"
+PREFIX = "prefix"
+SUBSTRING = "substring"
+CHOSEONG_PREFIX = "choseong_prefix"
+CHOSEONG_SUBSTRING = "choseong_substring"
+FUZZY = "fuzzy"
+
+_IGNORED_CHARS = re.compile(r"[\s\-_.,·()\[\]]+")
+_MAX_CHAR = "\U0010ffff"
+
+AptMatch = namedtuple("AptMatch", ["aptNm", "kind", "distance"])
+
+
+def normalize_name(name):
+    """유니코드 조합형 통일, 소문자화, 공백과 구분 기호 제거"""
+    # NFKC 는 호환 자모(ㄱ, ㅏ)를 첫가끝 자모로 바꿔버리므로 NFC 사용
+    name = unicodedata.normalize("NFC", name).lower()
+    return _IGNORED_CHARS.sub("", name)
+
+
+def decompose(text):
+    """완성형 한글을 자모 문자열로 분해 (그 외 문자는 그대로)"""
+    out = []
+    for ch in text:
+        code = ord(ch)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            idx = code - HANGUL_BASE
+            out.append(CHOSEONG[idx // 588])
+            out.append(JUNGSEONG[(idx % 588) // 28])
+            if idx % 28:
+                out.append(JONGSEONG[idx % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def choseong(text):
+    """완성형 한글을 초성 문자열로 변환 (그 외 문자는 그대로)"""
+    out = []
+    for ch in text:
+        code = ord(ch)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            out.append(CHOSEONG[(code - HANGUL_BASE) // 588])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def is_choseong_query(text):
+    """초성만으로 이루어진 입력인지 (예: 'ㅎㅅㅌㅇㅌ')"""
+    return bool(text) and all(ch in CHOSEONG for ch in text)
+
+
+def _choseong_range(cho):
+    """초성 cho 로 시작하는 완성형 글자 범위 (첫 글자, 끝 글자)"""
+    start = HANGUL_BASE + CHOSEONG.index(cho) * 588
+    return chr(start), chr(start + 587)
+
+
+def query_patterns(norm):
+    """
+    정규화된 입력을 (앞부분 문자열, 다음 글자 최소, 다음 글자 최대) 목록으로 변환.
+    마지막 글자만 아직 입력 중일 수 있다고 보고 범위로 풀어준다.
+    """
+    fixed, last = norm[:-1], norm[-1]
+    code = ord(last)
+    if HANGUL_BASE <= code <= HANGUL_LAST:
+        jong = (code - HANGUL_BASE) % 28
+        if jong == 0:
+            # '사' -> 사, 삭, 산, ..., 삿, 상 (받침이 붙을 수 있음)
+            return [(fixed, last, chr(code + 27))]
+        # 받침이 있는 글자는 그대로 ('장' 이 '자이' 에 걸리지 않도록 다음 글자로 넘겨 풀지 않는다)
+        return [(fixed, last, last)]
+    if last in CHOSEONG:
+        # '상ㄷ' -> '상' + 'ㄷ' 으로 시작하는 글자
+        return [(fixed, last, last), (fixed, *_choseong_range(last))]
+    return [(fixed, last, last)]
+
+
+def _patterns_regex(patterns):
+    return re.compile(
+        "|".join(f"{re.escape(fixed)}[{re.escape(lo)}-{re.escape(hi)}]" for fixed, lo, hi in patterns)
+    )
+
+
+class _SortedKeys:
+    """
+    키 목록의 정렬 순서. 앞부분이 같은 키들은 정렬 순서에서 연속 구간이 된다.
+    구간 안에서 순위가 가장 높은 키를 바로 찾을 수 있도록 sparse table 을 만들어 둔다.
+    """
+
+    def __init__(self, keys, rank_of):
+        self.keys = keys
+        self.sorted_ids = sorted(range(len(keys)), key=keys.__getitem__)
+        self.sorted_keys = [keys[i] for i in self.sorted_ids]
+        self.ranks = [rank_of[i] for i in self.sorted_ids]
+
+        # _best[p][pos] = 정렬 구간 [pos, pos + 2^p) 에서 순위가 가장 높은 위치
+        ranks = self.ranks
+        level = list(range(len(keys)))
+        self._best = [level]
+        width = 1
+        while width * 2 <= len(keys):
+            level = [
+                a if ranks[a] < ranks[b] else b
+                for a, b in zip(level, level[width:])
+            ]
+            self._best.append(level)
+            width *= 2
+
+    def segment(self, fixed, lo_char=None, hi_char=None):
+        """fixed 로 시작하고 (범위가 있으면) 다음 글자가 lo_char~hi_char 인 키들의 정렬 구간 [lo, hi)"""
+        if lo_char is None:
+            return (
+                bisect.bisect_left(self.sorted_keys, fixed),
+                bisect.bisect_left(self.sorted_keys, fixed + _MAX_CHAR),
+            )
+        return (
+            bisect.bisect_left(self.sorted_keys, fixed + lo_char),
+            bisect.bisect_left(self.sorted_keys, fixed + chr(ord(hi_char) + 1)),
+        )
+
+    def _best_in(self, lo, hi):
+        p = (hi - lo).bit_length() - 1
+        a, b = self._best[p][lo], self._best[p][hi - (1 << p)]
+        return a if self.ranks[a] < self.ranks[b] else b
+
+    def top(self, segments, need, found):
+        """정렬 구간들에 속한 키 id 중 found 에 없는 것을 순위 순으로 need 개까지"""
+        heap = []
+        for lo, hi in segments:
+            if lo < hi:
+                pos = self._best_in(lo, hi)
+                heap.append((self.ranks[pos], pos, lo, hi))
+        heapq.heapify(heap)
+
+        taken = []
+        while heap and len(taken) < need:
+            _, pos, lo, hi = heapq.heappop(heap)
+            i = self.sorted_ids[pos]
+            if i not in found and i not in taken:
+                taken.append(i)
+            # 꺼낸 위치를 빼고 남은 양쪽 구간을 다시 넣는다
+            for sub_lo, sub_hi in ((lo, pos), (pos + 1, hi)):
+                if sub_lo < sub_hi:
+                    best = self._best_in(sub_lo, sub_hi)
+                    heapq.heappush(heap, (self.ranks[best], best, sub_lo, sub_hi))
+        return taken
+
+
+class _Postings:
+    """키의 글자 unigram / bigram 역색인 (중간 일치 후보용). 목록은 순위 순으로 정렬돼 있다."""
+
+    def __init__(self, keys, by_rank, rank_of):
+        self.rank_of = rank_of
+        self.postings = {}
+        for i in by_rank:
+            key = keys[i]
+            grams = set(key)
+            grams.update(key[j:j + 2] for j in range(len(key) - 1))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(i)
+        self.chars = sorted(gram for gram in self.postings if len(gram) == 1)
+
+    def containing(self, fixed):
+        """fixed 를 포함할 수 있는 키 id (순위 순). fixed 의 bigram 중 가장 드문 것의 목록."""
+        if len(fixed) == 1:
+            return self.postings.get(fixed, [])
+        grams = {fixed[j:j + 2] for j in range(len(fixed) - 1)}
+        return min((self.postings.get(g, []) for g in grams), key=len)
+
+    def containing_char_range(self, lo_char, hi_char):
+        """lo_char~hi_char 범위 글자를 하나라도 포함하는 키 id (순위 순, 중복 가능)"""
+        start = bisect.bisect_left(self.chars, lo_char)
+        end = bisect.bisect_right(self.chars, hi_char)
+        return self.merge([self.postings[ch] for ch in self.chars[start:end]])
+
+    def merge(self, lists):
+        if len(lists) == 1:
+            return lists[0]
+        return heapq.merge(*lists, key=self.rank_of.__getitem__)
+
+
+class _Trie:
+    """정렬된 키로 만든 trie. 노드마다 그 아래 키들의 정렬 구간 [lo, hi) 을 가진다."""
+
+    def __init__(self, sorted_keys):
+        self.root = [{}, 0, len(sorted_keys)]
+        for pos, key in enumerate(sorted_keys):
+            node = self.root
+            for ch in key:
+                child = node[0].get(ch)
+                if child is None:
+                    child = [{}, pos, pos + 1]
+                    node[0][ch] = child
+                else:
+                    child[2] = pos + 1
+                node = child
+
+    def prefix_matches(self, query, max_distance):
+        """
+        query 와의 '앞부분' 편집 거리가 max_distance 이하인 구간 목록 [(거리, lo, hi)].
+        trie 를 따라 내려가며 DP 행을 계산하므로 앞부분이 같은 이름들은 한 번만 계산한다.
+        DP 는 대각선 +-max_distance 띠만 계산하고, 더 나아질 수 없는 가지는 내려가지 않는다.
+        """
+        n = len(query)
+        too_far = max_distance + 1
+        results = []
+        empty_row = [too_far] * (n + 1)
+        first = [min(j, too_far) for j in range(n + 1)]
+        stack = [(self.root, first, 0, too_far)]
+        while stack:
+            node, row, depth, best = stack.pop()
+            depth += 1
+            start = max(1, depth - max_distance)
+            end = min(n, depth + max_distance)
+            for ch, child in node[0].items():
+                cur = empty_row[:]
+                cur[0] = depth if depth < too_far else too_far
+                row_min = cur[0]
+                left = cur[start - 1]
+                for j in range(start, end + 1):
+                    value = row[j - 1] if query[j - 1] == ch else row[j - 1] + 1
+                    if row[j] < value:
+                        value = row[j] + 1
+                    if left < value:
+                        value = left + 1
+                    if value > too_far:
+                        value = too_far
+                    cur[j] = left = value
+                    if value < row_min:
+                        row_min = value
+                child_best = best
+                if cur[n] < best:
+                    # 이 노드 아래 이름들은 모두 거리 cur[n] 이하
+                    results.append((cur[n], child[1], child[2]))
+                    child_best = cur[n]
+                # 행의 최솟값은 내려갈수록 줄지 않으므로 best 보다 작아질 수 없으면 중단
+                if row_min < child_best:
+                    stack.append((child, cur, depth, child_best))
+        return results
+
+
+class AptNameIndex:
+    """
+    distinct 아파트 이름에 대한 검색 인덱스.
+
+    names: 아파트 이름 목록 또는 {이름: 거래 건수} dict (거래 건수는 동순위 정렬에 사용)
+    """
+
+    def __init__(self, names, max_distance=2):
+        if isinstance(names, dict):
+            weights = {name: int(count) for name, count in names.items()}
+        else:
+            weights = {name: 0 for name in names}
+
+        self.names = [name for name in weights if isinstance(name, str) and name]
+        self.weights = [weights[name] for name in self.names]
+        self.max_distance = max_distance
+
+        # 동순위 정렬 순서 (거래 건수 많은 순, 짧은 이름, 이름 순)
+        self._by_rank = sorted(
+            range(len(self.names)),
+            key=lambda i: (-self.weights[i], len(self.names[i]), self.names[i]),
+        )
+        self._rank_of = [0] * len(self.names)
+        for rank, i in enumerate(self._by_rank):
+            self._rank_of[i] = rank
+
+        self.normalized = [normalize_name(name) for name in self.names]
+        self._exact = {}
+        for i, norm in enumerate(self.normalized):
+            self._exact.setdefault(norm, []).append(i)
+
+        self._chars = _SortedKeys(self.normalized, self._rank_of)
+        self._char_postings = _Postings(self.normalized, self._by_rank, self._rank_of)
+
+        cho_keys = [choseong(norm) for norm in self.normalized]
+        self._cho = _SortedKeys(cho_keys, self._rank_of)
+        self._cho_postings = _Postings(cho_keys, self._by_rank, self._rank_of)
+
+        self._jamo = _SortedKeys([decompose(norm) for norm in self.normalized], self._rank_of)
+        self._jamo_trie = _Trie(self._jamo.sorted_keys)
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query, limit=10, fuzzy=True):
+        """query 에 대한 AptMatch 목록 (순위순, 최대 limit 개)"""
+        norm = normalize_name(query or "")
+        if not norm or limit <= 0:
+            return []
+
+        # id -> (단계 번호, 거리, 매칭 종류)
+        found = {}
+        patterns = query_patterns(norm)
+
+        stages = [
+            (EXACT, lambda need: self._exact.get(norm, [])[:need]),
+            (PREFIX, lambda need: self._prefix(patterns, need, found)),
+        ]
+        if is_choseong_query(norm):
+            stages += [
+                (CHOSEONG_PREFIX, lambda need: self._cho_prefix(norm, need, found)),
+                (CHOSEONG_SUBSTRING, lambda need: self._cho_substring(norm, need, found)),
+            ]
+        stages.append((SUBSTRING, lambda need: self._substring(patterns, need, found)))
+
+        for stage_no, (kind, stage) in enumerate(stages):
+            need = limit - len(found)
+            if need <= 0:
+                break
+            for i in stage(need):
+                found.setdefault(i, (stage_no, 0, kind))
+
+        # 이름을 끝까지 입력한 경우처럼 정확히/앞부분 일치가 있으면 오타 허용 단계는 건너뛴다
+        if fuzzy and len(found) < limit and not any(kind in (EXACT, PREFIX) for _, _, kind in found.values()):
+            for i, distance in self._fuzzy(norm, limit - len(found), found):
+                found.setdefault(i, (len(stages), distance, FUZZY))
+
+        ranked = sorted(found.items(), key=lambda item: (item[1][0], item[1][1], self._rank_of[item[0]]))
+        return [AptMatch(self.names[i], kind, distance) for i, (_, distance, kind) in ranked[:limit]]
+
+    def resolve(self, query):
+        """가장 순위가 높은 아파트 이름 하나 (없으면 None)"""
+        matches = self.search(query, limit=1)
+        return matches[0].aptNm if matches else None
+
+    def _take(self, ordered, accept, need, found):
+        """순위 순 후보 ordered 중 accept 를 통과하고 아직 찾지 않은 id 를 need 개까지"""
+        taken = []
+        for i in ordered:
+            if i in found or i in taken or not accept(i):
+                continue
+            taken.append(i)
+            if len(taken) >= need:
+                break
+        return taken
+
+    def _prefix(self, patterns, need, found):
+        segments = [self._chars.segment(fixed, lo, hi) for fixed, lo, hi in patterns]
+        return self._chars.top(segments, need, found)
+
+    def _substring(self, patterns, need, found):
+        postings = self._char_postings
+        ordered = postings.merge([
+            postings.containing(fixed) if fixed else postings.containing_char_range(lo, hi)
+            for fixed, lo, hi in patterns
+        ])
+        regex = _patterns_regex(patterns)
+        return self._take(ordered, lambda i: regex.search(self.normalized[i]) is not None, need, found)
+
+    def _cho_prefix(self, norm, need, found):
+        return self._cho.top([self._cho.segment(norm)], need, found)
+
+    def _cho_substring(self, norm, need, found):
+        ordered = self._cho_postings.containing(norm)
+        return self._take(ordered, lambda i: norm in self._cho.keys[i], need, found)
+
+    def _fuzzy(self, norm, need, found):
+        """자모 단위 앞부분 편집 거리로 오타 허용. [(id, 거리)] (거리, 순위 순)"""
+        jamo = decompose(norm)
+        # 짧은 입력에 오타를 많이 허용하면 아무거나 걸리므로 길이에 비례해서 제한
+        max_distance = min(self.max_distance, len(jamo) // 4)
+        if max_distance <= 0:
+            return []
+
+        by_distance = {}
+        for distance, lo, hi in self._jamo_trie.prefix_matches(jamo, max_distance):
+            by_distance.setdefault(distance, []).append((lo, hi))
+
+        # 거리가 작은 것부터 채운다 (안쪽 구간의 이름은 이미 더 작은 거리로 찾았으면 건너뜀)
+        taken = []
+        seen = set(found)
+        for distance in sorted(by_distance):
+            for i in self._jamo.top(by_distance[distance], need - len(taken), seen):
+                taken.append((i, distance))
+                seen.add(i)
+            if len(taken) >= need:
+                break
+        return taken
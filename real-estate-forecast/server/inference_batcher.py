@@ -0,0 +1,193 @@
+# server/inference_batcher.py
+"""
+동시 예측 요청을 모아서 한 번에 model.predict 하는 micro-batcher
+
+요청 스레드는 feature row 하나를 넣고 결과를 기다리고, 백그라운드 스레드가
+max_wait_ms 동안 (또는 max_batch_size 개가 찰 때까지) 모은 row들로 predict 를 한 번 호출한다.
+한가할 때(직전 배치가 1건이고 대기열이 비어 있으면)는 기다리지 않고 바로 예측한다.
+같은 row 가 이미 대기/계산 중이면 새로 넣지 않고 그 결과를 같이 받는다.
+배치 predict 가 실패하면 row 마다 다시 예측해서 문제가 된 row 의 요청만 실패시킨다.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+class InferenceBatcher:
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=2.0, stats_window=1000):
+        """
+        predict_fn: 2차원 row 목록을 받아 row 별 예측값 시퀀스를 돌려주는 함수 (예: model.predict)
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._inflight = {}  # row(tuple) -> Future
+
+        # 통계
+        self._requests = 0
+        self._deduped = 0
+        self._batches = 0
+        self._rows = 0
+        self._errors = 0
+        self._fallbacks = 0
+        self._last_batch_size = 0
+        self._batch_sizes = deque(maxlen=stats_window)
+        self._waits_ms = deque(maxlen=stats_window)
+        self._predict_ms = deque(maxlen=stats_window)
+
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, row):
+        """row 하나를 예측 대기열에 넣고 Future 반환 (결과는 float)"""
+        key = tuple(row)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("InferenceBatcher is closed")
+            self._requests += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self._deduped += 1
+                return future
+            future = Future()
+            self._inflight[key] = future
+
+        self._queue.put((key, time.perf_counter()))
+        return future
+
+    def predict(self, row, timeout=None):
+        """row 하나의 예측값 (결과가 나올 때까지 대기)"""
+        return self.submit(row).result(timeout=timeout)
+
+    def close(self):
+        """워커 스레드 종료 (대기 중인 row는 처리하고 끝냄)"""
+        with self._lock:
+            self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def stats(self):
+        """배치 크기 / 대기 시간 / 중복 제거 통계"""
+        with self._lock:
+            batch_sizes = list(self._batch_sizes)
+            waits_ms = list(self._waits_ms)
+            predict_ms = list(self._predict_ms)
+            return {
+                "requests": self._requests,
+                "deduped": self._deduped,
+                "batches": self._batches,
+                "rows_predicted": self._rows,
+                "errors": self._errors,
+                "fallback_batches": self._fallbacks,
+                "queue_size": self._queue.qsize(),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batch_size": _summary(batch_sizes),
+                "wait_ms": _summary(waits_ms),
+                "predict_ms": _summary(predict_ms),
+            }
+
+    def _collect(self):
+        """첫 row 를 기다린 뒤 max_wait 동안 / max_batch_size 까지 모으기. 종료 신호면 None."""
+        item = self._queue.get()
+        if item is None:
+            return None
+
+        batch = [item]
+        if self._last_batch_size <= 1 and self._queue.empty():
+            # 한가할 때 혼자 온 요청은 모을 게 없으니 max_wait 만큼 기다리지 않는다
+            return batch
+
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # 종료 신호는 이번 배치 처리 후에 다시 받도록 되돌려 놓는다
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            self._last_batch_size = len(batch)
+
+            keys = [key for key, _ in batch]
+            started = time.perf_counter()
+            try:
+                outcomes, fallback = self._predict(keys)
+            except Exception as e:
+                outcomes, fallback = [e] * len(keys), False
+            predict_ms = (time.perf_counter() - started) * 1000
+
+            with self._lock:
+                futures = [self._inflight.pop(key, None) for key in keys]
+                self._batches += 1
+                self._rows += len(keys)
+                self._batch_sizes.append(len(keys))
+                self._predict_ms.append(predict_ms)
+                self._waits_ms.extend((started - enqueued) * 1000 for _, enqueued in batch)
+                self._errors += sum(isinstance(outcome, Exception) for outcome in outcomes)
+                self._fallbacks += fallback
+
+            # 어떤 경우에도 모든 Future 를 끝내야 기다리는 요청이 멈추지 않는다
+            for future, outcome in zip(futures, outcomes):
+                if future is None or not future.set_running_or_notify_cancel():
+                    continue
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+
+    def _predict(self, keys):
+        """
+        row 별 결과(float 또는 예외) 목록과 row 단위로 다시 예측했는지 여부.
+        배치 예측이 실패하면 row 마다 따로 예측해서 실패를 해당 row 로 한정한다.
+        """
+        try:
+            return self._predict_rows(keys), False
+        except Exception as e:
+            if len(keys) == 1:
+                return [e], False
+
+        outcomes = []
+        for key in keys:
+            try:
+                outcomes.extend(self._predict_rows([key]))
+            except Exception as e:
+                outcomes.append(e)
+        return outcomes, True
+
+    def _predict_rows(self, keys):
+        preds = self.predict_fn([list(key) for key in keys])
+        if len(preds) != len(keys):
+            raise ValueError(f"predict_fn returned {len(preds)} predictions for {len(keys)} rows")
+        return [float(pred) for pred in preds]
+
+
+def _summary(values):
+    if not values:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "max": None}
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }